@@ -2,13 +2,18 @@
 
 This file is a straight translation of
 open_spiel/open_spiel/games/go/go_board.h, implementing the same
-algorithm and using the same datastructures.
+algorithm. Unlike the original, the board state is kept in parallel
+numpy arrays (structure-of-arrays) indexed by point rather than in
+per-point Python objects, and the per-move routines are compiled with
+numba so that a move executes as native loads and stores instead of
+interpreted bytecode.
 """
 import enum
-import random
+import functools
 from typing import Iterable, Text, Tuple
 
-import dataclasses
+import numpy as np
+from numba import njit
 
 Point = int
 
@@ -40,78 +45,54 @@ class Color(enum.IntEnum):
     return '?'
 
 
+# Plain int mirrors of Color for the hot paths; IntEnum comparisons and
+# Color.opponent() dispatch through Python-level methods, while these compile
+# to a plain load-and-compare both under numba and in the wrapper methods.
+BLACK = int(Color.BLACK)
+WHITE = int(Color.WHITE)
+EMPTY = int(Color.EMPTY)
+GUARD = int(Color.GUARD)
+
 VIRTUAL_BOARD_SIZE = 21
 VIRTUAL_BOARD_POINTS = VIRTUAL_BOARD_SIZE * VIRTUAL_BOARD_SIZE
 
 INVALID_POINT: Point = -1
 PASS: Point = 20 * VIRTUAL_BOARD_SIZE
 
+# Chain statistics for border (guard) points. Need to have values big enough
+# that they can never go below 0 even if all liberties are removed. The chain
+# statistic arrays are int64: a real chain has at most 4 * 361 pseudo
+# liberties with vertex ids below 441, so num_pseudo_liberties *
+# liberty_vertex_sum_squared stays below 2**40, and with these border
+# sentinels (drifting by at most 2 per guard point) below 2**34 - nowhere
+# near int64 overflow, so the in-atari product comparison is exact.
+_BORDER_NUM_PSEUDO_LIBERTIES = 4
+_BORDER_LIBERTY_VERTEX_SUM = 32768
+_BORDER_LIBERTY_VERTEX_SUM_SQUARED = 2147483648
+
 
 class Points:
   _HAS_DYNAMIC_ATTRIBUTES = True
 
   def __getattr__(self, name: Text) -> Point:
-    return parse_point(name)
+    point = _POINT_CACHE.get(name)
+    return parse_point(name) if point is None else point
 
 
 POINTS = Points()
 
 
-@dataclasses.dataclass
-class Vertex:
-  chain_head: Point
-  chain_next: Point
-  color: Color
-
-
-@dataclasses.dataclass
-class Chain:
-  """A directly connected group of stones."""
-  # Initialized to border values.
-  num_stones: int = 0
-  # Need to have values big enough that they can never go below 0 even if
-  # all liberties are removed.
-  num_pseudo_liberties: int = 4
-  liberty_vertex_sum: int = 32768
-  liberty_vertex_sum_squared: int = 2147483648
-
-  def in_atari(self) -> bool:
-    return (self.num_pseudo_liberties *
-            self.liberty_vertex_sum_squared == self.liberty_vertex_sum *
-            self.liberty_vertex_sum)
-
-  def reset(self):
-    self.num_stones = 0
-    self.num_pseudo_liberties = 0
-    self.liberty_vertex_sum = 0
-    self.liberty_vertex_sum_squared = 0
-
-  def merge(self, other: 'Chain'):
-    self.num_stones += other.num_stones
-    self.num_pseudo_liberties += other.num_pseudo_liberties
-    self.liberty_vertex_sum += other.liberty_vertex_sum
-    self.liberty_vertex_sum_squared += other.liberty_vertex_sum_squared
-
-  def add_liberty(self, p: Point):
-    self.num_pseudo_liberties += 1
-    self.liberty_vertex_sum += p
-    self.liberty_vertex_sum_squared += p * p
-
-  def remove_liberty(self, p: Point):
-    self.num_pseudo_liberties -= 1
-    self.liberty_vertex_sum -= p
-    self.liberty_vertex_sum_squared -= p * p
-
-  def single_liberty(self) -> Point:
-    assert self.in_atari()
-    assert self.liberty_vertex_sum % self.num_pseudo_liberties == 0
-    return self.liberty_vertex_sum // self.num_pseudo_liberties
+@functools.lru_cache(maxsize=None)
+def _board_points_arr(board_size: int) -> np.ndarray:
+  """Point ids of the playing area, computed once per board size."""
+  return np.array([point_from_2d(row, col)
+                   for row in range(board_size)
+                   for col in range(board_size)],
+                  dtype=np.int32)
 
 
 def board_points(board_size: int) -> Iterable[Point]:
-  for row in range(board_size):
-    for col in range(board_size):
-      yield point_from_2d(row, col)
+  yield from _board_points_arr(board_size).tolist()
 
 
 def parse_point(s: str) -> Point:
@@ -150,6 +131,16 @@ def format_point(p: Point) -> Text:
   return _COLS[col] + str(row + 1)
 
 
+# Precomputed parse_point results for every 19x19 coordinate (upper and lower
+# case), so that POINTS.D4 is a single dict lookup instead of string parsing.
+_POINT_CACHE = {'pass': PASS, 'PASS': PASS}
+for _col, _col_c in enumerate(_COLS):
+  for _row in range(19):
+    _p = point_from_2d(_row, _col)
+    _POINT_CACHE[f'{_col_c}{_row + 1}'] = _p
+    _POINT_CACHE[f'{_col_c.lower()}{_row + 1}'] = _p
+
+
 def neighbours(p: Point) -> Iterable[Point]:
   yield p + VIRTUAL_BOARD_SIZE
   yield p - 1
@@ -157,59 +148,462 @@ def neighbours(p: Point) -> Iterable[Point]:
   yield p - VIRTUAL_BOARD_SIZE
 
 
-# 2D array of zobrist values, indexed by point and color.
-_ZOBRIST_VALUES = [[random.randint(0, 2**64)
-                    for _ in range(4)]
-                   for _ in range(VIRTUAL_BOARD_POINTS)]
+# (VIRTUAL_BOARD_POINTS, 4) table of the neighbours of each point, so the
+# kernels fetch all four neighbour ids with a single contiguous load instead
+# of materializing them. Rows for points on the virtual border are clamped
+# into range; they are never dereferenced.
+_NEIGHBOURS = np.empty((VIRTUAL_BOARD_POINTS, 4), dtype=np.int32)
+for _q in range(VIRTUAL_BOARD_POINTS):
+  _NEIGHBOURS[_q] = (_q + VIRTUAL_BOARD_SIZE, _q - 1, _q + 1,
+                     _q - VIRTUAL_BOARD_SIZE)
+np.clip(_NEIGHBOURS, 0, VIRTUAL_BOARD_POINTS - 1, out=_NEIGHBOURS)
+
+
+# 2D array of zobrist values, indexed by point and color. Stored as uint64 so
+# the kernels can index it with a single strided load and XOR in a register.
+_ZOBRIST_VALUES = np.random.default_rng(0).integers(
+    0, 2**64, size=(VIRTUAL_BOARD_POINTS, 4), dtype=np.uint64)
+
+
+# Board colors are kept twice: as one int8 per point for cheap access from
+# Python, and bit-packed at 2 bits per point (the whole board fits in two
+# cache lines) for the neighbour scans in the kernels. Writers update both.
+_PACKED_COLOR_BYTES = VIRTUAL_BOARD_POINTS // 4 + 1
+
+
+def _pack_colors(color: np.ndarray) -> np.ndarray:
+  """Packs the int8 per-point color array into 2 bits per point."""
+  padded = np.zeros(_PACKED_COLOR_BYTES * 4, dtype=np.uint8)
+  padded[:VIRTUAL_BOARD_POINTS] = color
+  return (padded[0::4] | (padded[1::4] << 2) | (padded[2::4] << 4) |
+          (padded[3::4] << 6))
+
+
+@njit('(uint8[:], int64)', cache=True, nogil=True)
+def _packed_color_nb(color_packed, p):
+  return (color_packed[p >> 2] >> ((p & 3) * 2)) & 3
+
+
+@njit('(uint8[:], int64, int64)', cache=True, nogil=True)
+def _set_packed_color_nb(color_packed, p, c):
+  shift = (p & 3) * 2
+  color_packed[p >> 2] = ((color_packed[p >> 2] & (0xFF ^ (3 << shift))) |
+                          (c << shift))
+
+
+# The per-move routines below are module-level numba kernels operating on the
+# raw state arrays; GoBoard is a thin wrapper around them. Neighbours come
+# from the precomputed _NEIGHBOURS table, and chain statistics are indexed by
+# chain head. The explicit signatures make numba compile the kernels eagerly
+# at import instead of on their first call, so benchmark timings never
+# include JIT compilation; cache=True persists the compiled code across
+# processes.
+
+
+@njit('(int64[:], int64[:], int64[:], int64)', cache=True, nogil=True)
+def _in_atari_nb(num_pseudo_liberties, liberty_vertex_sum,
+                 liberty_vertex_sum_squared, head):
+  # A chain is in atari iff all its pseudo liberties are the same vertex,
+  # i.e. the variance of the liberty vertices is zero. All operands are
+  # int64 and bounded well below overflow (see the border sentinel comment),
+  # so this compiles to two multiplies and a compare.
+  return (num_pseudo_liberties[head] * liberty_vertex_sum_squared[head] ==
+          liberty_vertex_sum[head] * liberty_vertex_sum[head])
+
+
+@njit('(int8[:], int32[:], int32[:], int64[:], int64[:], int64[:], '
+      'int64[:], int64)',
+      cache=True, nogil=True)
+def _init_new_chain_nb(color, chain_head, chain_next, num_stones,
+                       num_pseudo_liberties, liberty_vertex_sum,
+                       liberty_vertex_sum_squared, p):
+  """Initialize this point to a new chain."""
+  chain_head[p] = p
+  chain_next[p] = p
+
+  num_stones[p] = 1
+  num_pseudo_liberties[p] = 0
+  liberty_vertex_sum[p] = 0
+  liberty_vertex_sum_squared[p] = 0
+
+  for k in range(4):
+    n = _NEIGHBOURS[p, k]
+    if color[n] == EMPTY:
+      num_pseudo_liberties[p] += 1
+      liberty_vertex_sum[p] += n
+      liberty_vertex_sum_squared[p] += n * n
+
+
+@njit('(int8[:], int32[:], int32[:], int64[:], int64[:], int64[:], '
+      'int64[:], int64, int64)',
+      cache=True, nogil=True)
+def _join_chains_around_nb(color, chain_head, chain_next, num_stones,
+                           num_pseudo_liberties, liberty_vertex_sum,
+                           liberty_vertex_sum_squared, p, c):
+  """Connects any chains connected by a newly placed stone."""
+  # Combines the groups around the newly placed stone at vertex. If no groups
+  # are available for joining, the new stone is placed as a new group.
+  largest_chain_head = INVALID_POINT
+  largest_chain_size = 0
+  for k in range(4):
+    n = _NEIGHBOURS[p, k]
+    if color[n] == c:
+      head = chain_head[n]
+      if num_stones[head] > largest_chain_size:
+        largest_chain_size = num_stones[head]
+        largest_chain_head = head
+
+  if largest_chain_size == 0:
+    _init_new_chain_nb(color, chain_head, chain_next, num_stones,
+                       num_pseudo_liberties, liberty_vertex_sum,
+                       liberty_vertex_sum_squared, p)
+    return
+
+  for k in range(4):
+    n = _NEIGHBOURS[p, k]
+    if color[n] == c:
+      head = chain_head[n]
+      if head != largest_chain_head:
+        num_stones[largest_chain_head] += num_stones[head]
+        num_pseudo_liberties[largest_chain_head] += num_pseudo_liberties[head]
+        liberty_vertex_sum[largest_chain_head] += liberty_vertex_sum[head]
+        liberty_vertex_sum_squared[largest_chain_head] += (
+            liberty_vertex_sum_squared[head])
+
+        # Set all stones in the smaller string to be part of the larger chain.
+        cur = n
+        while True:
+          chain_head[cur] = largest_chain_head
+          cur = chain_next[cur]
+          if cur == n:
+            break
+
+        # Connect the 2 linked lists representing the stones in the 2 chains.
+        chain_next[largest_chain_head], chain_next[n] = (
+            chain_next[n], chain_next[largest_chain_head])
+
+  chain_next[p] = chain_next[largest_chain_head]
+  chain_next[largest_chain_head] = p
+  chain_head[p] = largest_chain_head
+  num_stones[largest_chain_head] += 1
+
+  for k in range(4):
+    n = _NEIGHBOURS[p, k]
+    if color[n] == EMPTY:
+      num_pseudo_liberties[largest_chain_head] += 1
+      liberty_vertex_sum[largest_chain_head] += n
+      liberty_vertex_sum_squared[largest_chain_head] += n * n
+
+
+@njit('(int8[:], uint8[:], int32[:], int32[:], int64[:], int64[:], '
+      'int64[:], int64[:], uint64[:, :], int64)',
+      cache=True, nogil=True)
+def _remove_chain_nb(color, color_packed, chain_head, chain_next, num_stones,
+                     num_pseudo_liberties, liberty_vertex_sum,
+                     liberty_vertex_sum_squared, zobrist_values, p):
+  """Remove and reset all stones in the chain that this stone is part of.
+
+  Returns the zobrist delta for the removed stones.
+  """
+  # Liberties restored to the surrounding chains are accumulated per distinct
+  # chain head and applied once at the end, instead of writing three chain
+  # stats per stone-neighbour pair. Nothing reads those stats while the chain
+  # is being walked, so deferring the additive updates is equivalent. If a
+  # capture borders more distinct chains than fit the buffer (rare), the
+  # remainder is applied immediately.
+  adjacent_heads = np.empty(32, dtype=np.int64)
+  delta_liberties = np.empty(32, dtype=np.int64)
+  delta_vertex_sum = np.empty(32, dtype=np.int64)
+  delta_vertex_sum_squared = np.empty(32, dtype=np.int64)
+  num_adjacent = 0
+
+  hash_delta = np.uint64(0)
+  this_chain_head = chain_head[p]
+  cur = p
+  while True:
+    next_p = chain_next[cur]
+
+    hash_delta ^= zobrist_values[cur, color[cur]]
+    color[cur] = EMPTY
+    _set_packed_color_nb(color_packed, cur, EMPTY)
+    _init_new_chain_nb(color, chain_head, chain_next, num_stones,
+                       num_pseudo_liberties, liberty_vertex_sum,
+                       liberty_vertex_sum_squared, cur)
+
+    for k in range(4):
+      n = _NEIGHBOURS[cur, k]
+      if chain_head[n] != this_chain_head or color[n] == EMPTY:
+        head = chain_head[n]
+        slot = -1
+        for j in range(num_adjacent):
+          if adjacent_heads[j] == head:
+            slot = j
+            break
+        if slot >= 0:
+          delta_liberties[slot] += 1
+          delta_vertex_sum[slot] += cur
+          delta_vertex_sum_squared[slot] += cur * cur
+        elif num_adjacent < adjacent_heads.shape[0]:
+          adjacent_heads[num_adjacent] = head
+          delta_liberties[num_adjacent] = 1
+          delta_vertex_sum[num_adjacent] = cur
+          delta_vertex_sum_squared[num_adjacent] = cur * cur
+          num_adjacent += 1
+        else:
+          num_pseudo_liberties[head] += 1
+          liberty_vertex_sum[head] += cur
+          liberty_vertex_sum_squared[head] += cur * cur
+
+    cur = next_p
+    if cur == p:
+      break
+
+  for j in range(num_adjacent):
+    head = adjacent_heads[j]
+    num_pseudo_liberties[head] += delta_liberties[j]
+    liberty_vertex_sum[head] += delta_vertex_sum[j]
+    liberty_vertex_sum_squared[head] += delta_vertex_sum_squared[j]
+
+  return hash_delta
+
+
+@njit('(int8[:], uint8[:], int32[:], int32[:], int64[:], int64[:], '
+      'int64[:], int64[:], int32[:], uint64[:, :], int64, int64)',
+      cache=True, nogil=True)
+def _play_nb(color, color_packed, chain_head, chain_next, num_stones,
+             num_pseudo_liberties, liberty_vertex_sum,
+             liberty_vertex_sum_squared, last_captures, zobrist_values, p, c):
+  """Applies the move to the state arrays.
+
+  Returns (zobrist hash delta, number of stones captured, new ko point).
+  """
+  # Preparation for ko checking.
+  played_in_enemy_eye = True
+  for k in range(4):
+    n = _NEIGHBOURS[p, k]
+    nc = _packed_color_nb(color_packed, n)
+    if nc == c or nc == EMPTY:
+      played_in_enemy_eye = False
+      break
+
+  _join_chains_around_nb(color, chain_head, chain_next, num_stones,
+                         num_pseudo_liberties, liberty_vertex_sum,
+                         liberty_vertex_sum_squared, p, c)
+  hash_delta = zobrist_values[p, c]
+  color[p] = c
+  _set_packed_color_nb(color_packed, p, c)
+
+  # Remove the liberty at p from all neighbouring chains and detect dead
+  # opponent chains in the same pass; each dead chain crosses zero liberties
+  # exactly once, so it is recorded exactly once. The actual removal happens
+  # after the scan - removing a chain reinitializes its points, and a later
+  # neighbour in the scan might be one of them.
+  capture_index = 0
+  # BLACK ^ 1 == WHITE and vice versa; play() only passes stone colors.
+  opponent = c ^ 1
+  for k in range(4):
+    n = _NEIGHBOURS[p, k]
+    head = chain_head[n]
+    num_pseudo_liberties[head] -= 1
+    liberty_vertex_sum[head] -= p
+    liberty_vertex_sum_squared[head] -= p * p
+    if (_packed_color_nb(color_packed, n) == opponent and
+        num_pseudo_liberties[head] == 0):
+      last_captures[capture_index] = head
+      capture_index += 1
+
+  stones_captured = 0
+  for i in range(capture_index):
+    head = last_captures[i]
+    stones_captured += num_stones[head]
+    hash_delta ^= _remove_chain_nb(color, color_packed, chain_head,
+                                   chain_next, num_stones,
+                                   num_pseudo_liberties, liberty_vertex_sum,
+                                   liberty_vertex_sum_squared, zobrist_values,
+                                   head)
+
+  last_captures[capture_index:] = INVALID_POINT
+
+  if played_in_enemy_eye and stones_captured == 1:
+    new_ko_point = last_captures[0]
+  else:
+    new_ko_point = INVALID_POINT
+
+  return hash_delta, stones_captured, new_ko_point
+
+
+@njit('(uint8[:], int32[:], int64[:], int64[:], int64[:], int64, int64, '
+      'int64)',
+      cache=True, nogil=True)
+def _is_legal_move_nb(color_packed, chain_head, num_pseudo_liberties,
+                      liberty_vertex_sum, liberty_vertex_sum_squared, p, c,
+                      last_ko_point):
+  if _packed_color_nb(color_packed, p) != EMPTY or p == last_ko_point:
+    return False
+  if num_pseudo_liberties[chain_head[p]] > 0:
+    return True
+
+  # The newly placed stone would be completely surrounded by enemy and
+  # friendly stones. One pass over the neighbours suffices: the move is legal
+  # if it connects to a friendly group with a spare liberty, or kills an
+  # enemy group in atari. c is always BLACK or WHITE here, so the opponent
+  # is just an XOR away.
+  opponent = c ^ 1
+  for k in range(4):
+    n = _NEIGHBOURS[p, k]
+    nc = _packed_color_nb(color_packed, n)
+    in_atari = _in_atari_nb(num_pseudo_liberties, liberty_vertex_sum,
+                            liberty_vertex_sum_squared, chain_head[n])
+    if nc == c and not in_atari:
+      return True
+    if nc == opponent and in_atari:
+      return True
+
+  return False
+
+
+@njit('(uint8[:], int32[:], int64[:], int64[:], int64[:], int64, int64, '
+      'int64)',
+      cache=True, nogil=True)
+def _legal_moves_mask_nb(color_packed, chain_head, num_pseudo_liberties,
+                         liberty_vertex_sum, liberty_vertex_sum_squared,
+                         board_size, last_ko_point, c):
+  """Returns a legality mask over all virtual points for color c."""
+  mask = np.zeros(VIRTUAL_BOARD_POINTS, dtype=np.bool_)
+  for row in range(board_size):
+    base = (row + 1) * VIRTUAL_BOARD_SIZE + 1
+    for col in range(board_size):
+      p = base + col
+      mask[p] = _is_legal_move_nb(color_packed, chain_head,
+                                  num_pseudo_liberties,
+                                  liberty_vertex_sum,
+                                  liberty_vertex_sum_squared, p, c,
+                                  last_ko_point)
+  return mask
+
+
+# Pool of released GoBoard instances recycled by clone(), to avoid
+# reallocating the state arrays for every copy.
+_POOL = []
 
 
 class GoBoard:
   """GoBoard implementation optimized for speed, at least in the C++ version."""
 
+  # Slot-based layout: attribute access skips the per-instance __dict__ and
+  # instances (which the clone pool recycles constantly) get smaller.
+  __slots__ = ('_board_size', '_last_ko_point', '_in_board', '_color',
+               '_color_packed', '_chain_head', '_chain_next', '_num_stones',
+               '_num_pseudo_liberties', '_liberty_vertex_sum',
+               '_liberty_vertex_sum_squared', '_last_captures',
+               '_zobrist_hash')
+
   def __init__(self, board_size: int):
     self._board_size = board_size
     self._last_ko_point = INVALID_POINT
 
-    self._board = [
-        Vertex(chain_head=i, chain_next=i, color=Color.GUARD)
-        for i in range(VIRTUAL_BOARD_POINTS)
-    ]
-    self._chains = [Chain() for _ in range(VIRTUAL_BOARD_POINTS)]
-    self._last_captures = [INVALID_POINT for _ in range(4)]
+    # Per-point vertex state.
+    self._color = np.full(VIRTUAL_BOARD_POINTS, GUARD, dtype=np.int8)
+    self._chain_head = np.arange(VIRTUAL_BOARD_POINTS, dtype=np.int32)
+    self._chain_next = np.arange(VIRTUAL_BOARD_POINTS, dtype=np.int32)
+
+    # Per-chain statistics, indexed by chain head. Initialized to border
+    # values.
+    self._num_stones = np.zeros(VIRTUAL_BOARD_POINTS, dtype=np.int64)
+    self._num_pseudo_liberties = np.full(VIRTUAL_BOARD_POINTS,
+                                         _BORDER_NUM_PSEUDO_LIBERTIES,
+                                         dtype=np.int64)
+    self._liberty_vertex_sum = np.full(VIRTUAL_BOARD_POINTS,
+                                       _BORDER_LIBERTY_VERTEX_SUM,
+                                       dtype=np.int64)
+    self._liberty_vertex_sum_squared = np.full(
+        VIRTUAL_BOARD_POINTS,
+        _BORDER_LIBERTY_VERTEX_SUM_SQUARED,
+        dtype=np.int64)
+
+    self._last_captures = np.full(4, INVALID_POINT, dtype=np.int32)
+
+    # Clear the playing area and accumulate the initial liberties with shifted
+    # views of the empty-mask, instead of looping over points and neighbours.
+    shape = (VIRTUAL_BOARD_SIZE, VIRTUAL_BOARD_SIZE)
+    inner = slice(1, board_size + 1)
+    self._in_board = np.zeros(VIRTUAL_BOARD_POINTS, dtype=bool)
+    self._in_board.reshape(shape)[inner, inner] = True
+    self._color.reshape(shape)[inner, inner] = EMPTY
+    self._num_stones.reshape(shape)[inner, inner] = 0
+
+    empty = self._color.reshape(shape) == EMPTY
+    ids = np.arange(VIRTUAL_BOARD_POINTS, dtype=np.int64).reshape(shape)
+    num_pseudo_liberties = self._num_pseudo_liberties.reshape(shape)
+    liberty_vertex_sum = self._liberty_vertex_sum.reshape(shape)
+    liberty_vertex_sum_squared = self._liberty_vertex_sum_squared.reshape(
+        shape)
+
+    num_pseudo_liberties[inner, inner] = 0
+    liberty_vertex_sum[inner, inner] = 0
+    liberty_vertex_sum_squared[inner, inner] = 0
+    for dr, dc in ((1, 0), (0, -1), (0, 1), (-1, 0)):
+      neighbour = (slice(1 + dr, board_size + 1 + dr),
+                   slice(1 + dc, board_size + 1 + dc))
+      neighbour_empty = empty[neighbour]
+      neighbour_ids = ids[neighbour]
+      num_pseudo_liberties[inner, inner] += neighbour_empty
+      liberty_vertex_sum[inner, inner] += neighbour_empty * neighbour_ids
+      liberty_vertex_sum_squared[inner, inner] += (
+          neighbour_empty * neighbour_ids * neighbour_ids)
+
+    self._color_packed = _pack_colors(self._color)
 
-    for p in board_points(board_size):
-      self._board[p].color = Color.EMPTY
-      self._chains[p].reset()
+    self._zobrist_hash = 0
 
-    for p in board_points(board_size):
-      for n in neighbours(p):
-        if self.is_empty(n):
-          self._chains[p].add_liberty(n)
+  def _empty_like(self) -> 'GoBoard':
+    """Returns a GoBoard with allocated but uninitialized state arrays.
 
-    self._zobrist_hash = 0
+    Skips the neighbour-liberty initialization done by __init__; only useful
+    when the caller overwrites the full state anyway, as clone() does.
+    """
+    # pylint: disable=protected-access
+    other = GoBoard.__new__(GoBoard)
+    other._board_size = self._board_size
+    other._last_ko_point = INVALID_POINT
+    other._in_board = np.empty(VIRTUAL_BOARD_POINTS, dtype=bool)
+    other._color = np.empty(VIRTUAL_BOARD_POINTS, dtype=np.int8)
+    other._color_packed = np.empty(_PACKED_COLOR_BYTES, dtype=np.uint8)
+    other._chain_head = np.empty(VIRTUAL_BOARD_POINTS, dtype=np.int32)
+    other._chain_next = np.empty(VIRTUAL_BOARD_POINTS, dtype=np.int32)
+    other._num_stones = np.empty(VIRTUAL_BOARD_POINTS, dtype=np.int64)
+    other._num_pseudo_liberties = np.empty(VIRTUAL_BOARD_POINTS,
+                                           dtype=np.int64)
+    other._liberty_vertex_sum = np.empty(VIRTUAL_BOARD_POINTS, dtype=np.int64)
+    other._liberty_vertex_sum_squared = np.empty(VIRTUAL_BOARD_POINTS,
+                                                 dtype=np.int64)
+    other._last_captures = np.empty(4, dtype=np.int32)
+    other._zobrist_hash = 0
+    # pylint: enable=protected-access
+    return other
+
+  def release(self):
+    """Returns this board to the pool so a later clone() can reuse it."""
+    _POOL.append(self)
 
   def clone(self) -> 'GoBoard':
     """Returns a deep copy of this GoBoard instance."""
-    # Manually write out a copy constructor.. deepcopy is 3x slower than even
-    # this terribly slow implementation.
-    other = GoBoard(self._board_size)
+    other = _POOL.pop() if _POOL else self._empty_like()
     # pylint: disable=protected-access
+    other._board_size = self._board_size
     other._last_ko_point = self._last_ko_point
 
-    for i in range(VIRTUAL_BOARD_POINTS):
-      other._board[i].chain_head = self._board[i].chain_head
-      other._board[i].chain_next = self._board[i].chain_next
-      other._board[i].color = self._board[i].color
-
-      other._chains[i].num_stones = self._chains[i].num_stones
-      other._chains[i].num_pseudo_liberties = self._chains[
-          i].num_pseudo_liberties
-      other._chains[i].liberty_vertex_sum = self._chains[i].liberty_vertex_sum
-      other._chains[i].liberty_vertex_sum_squared = self._chains[
-          i].liberty_vertex_sum_squared
-
-    for i in range(len(self._last_captures)):
-      other._last_captures[i] = self._last_captures[i]
+    np.copyto(other._in_board, self._in_board)
+    np.copyto(other._color, self._color)
+    np.copyto(other._color_packed, self._color_packed)
+    np.copyto(other._chain_head, self._chain_head)
+    np.copyto(other._chain_next, self._chain_next)
+    np.copyto(other._num_stones, self._num_stones)
+    np.copyto(other._num_pseudo_liberties, self._num_pseudo_liberties)
+    np.copyto(other._liberty_vertex_sum, self._liberty_vertex_sum)
+    np.copyto(other._liberty_vertex_sum_squared,
+              self._liberty_vertex_sum_squared)
+    np.copyto(other._last_captures, self._last_captures)
 
     other._zobrist_hash = self._zobrist_hash
     # pylint: enable=protected-access
@@ -217,32 +611,38 @@ class GoBoard:
     return other
 
   def point_color(self, p: Point) -> Color:
-    return self._board[p].color
+    return Color(int(self._color[p]))
 
   def is_empty(self, p: Point) -> bool:
-    return self._board[p].color == Color.EMPTY
+    return self._color[p] == EMPTY
 
   def in_board_area(self, p: Point) -> bool:
-    row, col = point_to_2d(p)
-    return (row >= 0 and row < self._board_size and col >= 0 and
-            col < self._board_size)
+    # The range check keeps out-of-table points (anything parse_point might
+    # produce) from wrapping around the mask.
+    return 0 <= p < VIRTUAL_BOARD_POINTS and bool(self._in_board[p])
 
   def pseudo_liberty(self, p: Point) -> int:
-    chain = self._chain(p)
-    if chain.num_pseudo_liberties == 0:
+    head = self._chain_head[p]
+    if self._num_pseudo_liberties[head] == 0:
       return 0
-    elif chain.in_atari():
+    elif self.in_atari(p):
       return 1
     else:
-      return chain.num_pseudo_liberties
+      return int(self._num_pseudo_liberties[head])
 
   def in_atari(self, p: Point) -> bool:
-    return self._chain(p).in_atari()
+    return bool(
+        _in_atari_nb(self._num_pseudo_liberties, self._liberty_vertex_sum,
+                     self._liberty_vertex_sum_squared, self._chain_head[p]))
 
   def single_liberty(self, p: Point) -> Point:
     """If the chain this point is part of has a single liberty, return it."""
     head = self.chain_head(p)
-    liberty = self._chain(p).single_liberty()
+    assert self.in_atari(p)
+    assert self._liberty_vertex_sum[head] % self._num_pseudo_liberties[
+        head] == 0
+    liberty = int(self._liberty_vertex_sum[head] //
+                  self._num_pseudo_liberties[head])
 
     # Check it is really a liberty.
     assert self.in_board_area(liberty)
@@ -264,26 +664,25 @@ class GoBoard:
       return True
     if not self.in_board_area(p):
       return False
-    if not self.is_empty(p) or p == self._last_ko_point:
-      return False
-    if self._chain(p).num_pseudo_liberties > 0:
-      return True
-
-    # For all checks below, the newly placed stone is completely surrounded by
-    # enemy and friendly stones.
-
-    # Allow to play if the placed stones connects to a group that still has at
-    # least one other liberty after connecting.
-    for n in neighbours(p):
-      if self.point_color(n) == c and not self._chain(n).in_atari():
-        return True
-
-    # Allow to play if the placed stone will kill at least one group.
-    for n in neighbours(p):
-      if self.point_color(n) == c.opponent() and self._chain(n).in_atari():
-        return True
-
-    return False
+    return bool(
+        _is_legal_move_nb(self._color_packed, self._chain_head,
+                          self._num_pseudo_liberties,
+                          self._liberty_vertex_sum,
+                          self._liberty_vertex_sum_squared, p, int(c),
+                          self._last_ko_point))
+
+  def legal_moves_mask(self, c: Color) -> np.ndarray:
+    """Returns a boolean legality mask over all virtual board points.
+
+    Equivalent to calling is_legal_move for every point of the playing area,
+    but in a single kernel call; PASS is not included in the mask.
+    """
+    return _legal_moves_mask_nb(self._color_packed, self._chain_head,
+                                self._num_pseudo_liberties,
+                                self._liberty_vertex_sum,
+                                self._liberty_vertex_sum_squared,
+                                self._board_size, self._last_ko_point,
+                                int(c))
 
   def play(self, p: Point, c: Color):
     """Applies the move to the board."""
@@ -291,85 +690,19 @@ class GoBoard:
       self._last_ko_point = INVALID_POINT
       return
 
-    assert self._board[p].color == Color.EMPTY
-
-    # Preparation for ko checking.
-    played_in_enemy_eye = True
-    for n in neighbours(p):
-      nc = self.point_color(n)
-      if nc == c or nc == Color.EMPTY:
-        played_in_enemy_eye = False
-        break
-
-    self._join_chains_around(p, c)
-    self._set_stone(p, c)
-    self._remove_liberty_from_neighbouring_chains(p)
-    stones_captured = self._capture_dead_chains(p, c)
-
-    if played_in_enemy_eye and stones_captured == 1:
-      self._last_ko_point = self._last_captures[0]
-    else:
-      self._last_ko_point = INVALID_POINT
+    assert self._color[p] == EMPTY
 
-    assert self._chain(
-        p).num_pseudo_liberties > 0, f'suicide: {c} {format_point(p)} on {self}'
+    hash_delta, _, new_ko_point = _play_nb(
+        self._color, self._color_packed, self._chain_head, self._chain_next,
+        self._num_stones, self._num_pseudo_liberties,
+        self._liberty_vertex_sum, self._liberty_vertex_sum_squared,
+        self._last_captures, _ZOBRIST_VALUES, p, int(c))
 
-  def _set_stone(self, p: Point, c: Color):
-    if c == Color.EMPTY:
-      self._zobrist_hash ^= _ZOBRIST_VALUES[p][self.point_color(p)]
-    else:
-      self._zobrist_hash ^= _ZOBRIST_VALUES[p][c]
-
-    self._board[p].color = c
-
-  def _join_chains_around(self, p: Point, c: Color):
-    """Connects any chains connected by a newly placed stone."""
-    # Combines the groups around the newly placed stone at vertex. If no groups
-    # are available for joining, the new stone is placed as a new group.
-    largest_chain_head = INVALID_POINT
-    largest_chain_size = 0
-    for n in neighbours(p):
-      if self.point_color(n) == c:
-        chain = self._chain(n)
-        if chain.num_stones > largest_chain_size:
-          largest_chain_size = chain.num_stones
-          largest_chain_head = self.chain_head(n)
-
-    if largest_chain_size == 0:
-      self._init_new_chain(p)
-      return
+    self._zobrist_hash ^= int(hash_delta)
+    self._last_ko_point = int(new_ko_point)
 
-    for n in neighbours(p):
-      if self.point_color(n) == c:
-        chain_head = self.chain_head(n)
-        if chain_head != largest_chain_head:
-          self._chain(largest_chain_head).merge(self._chain(n))
-
-          # Set all stones in the smaller string to be part of the larger chain.
-          cur = n
-          while True:
-            self._board[cur].chain_head = largest_chain_head
-            cur = self._board[cur].chain_next
-            if cur == n:
-              break
-
-          # Connect the 2 linked lists representing the stones in the 2 chains.
-          self._board[largest_chain_head].chain_next, self._board[
-              n].chain_next = (self._board[n].chain_next,
-                               self._board[largest_chain_head].chain_next)
-
-    self._board[p].chain_next = self._board[largest_chain_head].chain_next
-    self._board[largest_chain_head].chain_next = p
-    self._board[p].chain_head = largest_chain_head
-    self._chain(largest_chain_head).num_stones += 1
-
-    for n in neighbours(p):
-      if self.is_empty(n):
-        self._chain(largest_chain_head).add_liberty(n)
-
-  def _remove_liberty_from_neighbouring_chains(self, p: Point):
-    for n in neighbours(p):
-      self._chain(n).remove_liberty(p)
+    assert self._num_pseudo_liberties[self._chain_head[
+        p]] > 0, f'suicide: {c} {format_point(p)} on {self}'
 
   def __str__(self) -> Text:
     s = f'GoBoard(size={self._board_size})\n'
@@ -382,65 +715,14 @@ class GoBoard:
     s += '\n'
     return s
 
-  def _capture_dead_chains(self, p: Point, c: Color) -> int:
-    """Remove any dead stones from the board."""
-    stones_captured = 0
-    capture_index = 0
-    for n in neighbours(p):
-      if self.point_color(n) == c.opponent() and self._chain(
-          n).num_pseudo_liberties == 0:
-        self._last_captures[capture_index] = self.chain_head(n)
-        capture_index += 1
-        stones_captured += self._chain(n).num_stones
-        self._remove_chain(n)
-
-    for i in range(capture_index, len(self._last_captures)):
-      self._last_captures[i] = INVALID_POINT
-
-    return stones_captured
-
-  def _remove_chain(self, p: Point):
-    """Remove and reset all stones in the chain that this stone is part of."""
-    this_chain_head = self.chain_head(p)
-    cur = p
-    while True:
-      next_p = self._board[cur].chain_next
-
-      self._set_stone(cur, Color.EMPTY)
-      self._init_new_chain(cur)
-
-      for n in neighbours(cur):
-        if self.chain_head(n) != this_chain_head or self.is_empty(n):
-          self._chain(n).add_liberty(cur)
-
-      cur = next_p
-      if cur == p:
-        break
-
-  def _init_new_chain(self, p: Point):
-    """Initialize this point to a new chain."""
-    self._board[p].chain_head = p
-    self._board[p].chain_next = p
-
-    c = self._chain(p)
-    c.reset()
-    c.num_stones += 1
-
-    for n in neighbours(p):
-      if self.is_empty(n):
-        c.add_liberty(n)
-
   # Head of a chain; each chain has exactly one head that can be used to
   # uniquely identify it. Chain heads may change over successive play() calls.
   def chain_head(self, p: Point) -> Point:
-    return self._board[p].chain_head
+    return int(self._chain_head[p])
 
   # Number of stones in a chain.
   def chain_size(self, p: Point) -> int:
-    return self._chain(p).num_stones
-
-  def _chain(self, p: Point) -> Chain:
-    return self._chains[self.chain_head(p)]
+    return int(self._num_stones[self._chain_head[p]])
 
 
 def create_board(s: Text) -> GoBoard: